@@ -10,5 +10,12 @@ class Config:
     PLAID_ENV = os.getenv('PLAID_ENV', 'sandbox')
     HF_API_KEY = os.getenv('HF_API_KEY')
     PORT = int(os.getenv('PORT', 8000))
+    PLAID_MAX_WORKERS = int(os.getenv('PLAID_MAX_WORKERS', 8))
+    # Admission control for LLM-backed routes (per route)
+    AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 4))
+    AI_MAX_QUEUE = int(os.getenv('AI_MAX_QUEUE', 16))
+    AI_QUEUE_DEADLINE = float(os.getenv('AI_QUEUE_DEADLINE', 10))
+    # Per-user card partitions (and their reward indexes) kept in memory
+    CARD_PARTITION_CACHE_SIZE = int(os.getenv('CARD_PARTITION_CACHE_SIZE', 256))
 
 settings = Config()
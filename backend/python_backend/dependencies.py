@@ -0,0 +1,9 @@
+from fastapi import Header, HTTPException
+from services.card_service import DEFAULT_USER, CardService
+
+def get_card_service(x_user_id: str = Header(DEFAULT_USER)) -> CardService:
+    # Each user's cards live in their own partition, built on first request.
+    # Requests without X-User-Id use the original shared file.
+    if not CardService.is_valid_user_id(x_user_id):
+        raise HTTPException(status_code=400, detail="Invalid X-User-Id header")
+    return CardService.for_user(x_user_id)
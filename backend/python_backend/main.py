@@ -1,30 +1,70 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from config import settings
 from routers import plaid, simulator, insights, learning, cards
+from services import metrics
+import time
 
 app = FastAPI(title="CredZen Backend", version="1.0.0")
 
+FRONTEND_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173"]
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],  # Frontend URL
+    allow_origins=FRONTEND_ORIGINS,  # Frontend URL
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Request latency histogram + Server-Timing header with the per-component breakdown
+@app.middleware("http")
+async def record_timing(request: Request, call_next):
+    spans = metrics.start_request()
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    # Label by route template (e.g. /api/cards/{card_id}) to keep cardinality bounded
+    route = request.scope.get("route")
+    if route is None:
+        route_path = "unmatched"
+    else:
+        route_path = route_templates.get(id(route), route.path)
+    metrics.REQUEST_DURATION.observe(elapsed, request.method, route_path, str(response.status_code))
+    response.headers["Server-Timing"] = metrics.server_timing_header(spans, elapsed)
+    # Lets the browser's resource timing entries see Server-Timing cross-origin
+    response.headers["Timing-Allow-Origin"] = ", ".join(FRONTEND_ORIGINS)
+    return response
+
 # Register RoutersAPI
-app.include_router(plaid.router, tags=["Plaid"]) # Root level for Plaid compatibility
-app.include_router(simulator.router, prefix="/api/simulator", tags=["Simulator"])
-app.include_router(insights.router, prefix="/api/smart-pick", tags=["Smart Pick"])
-app.include_router(learning.router, prefix="/api/learning", tags=["Learning"])
-app.include_router(cards.router, prefix="/api/cards", tags=["Cards"])
+ROUTERS = [
+    (plaid.router, "", ["Plaid"]), # Root level for Plaid compatibility
+    (simulator.router, "/api/simulator", ["Simulator"]),
+    (insights.router, "/api/smart-pick", ["Smart Pick"]),
+    (learning.router, "/api/learning", ["Learning"]),
+    (cards.router, "/api/cards", ["Cards"]),
+]
+# Full path template per route object, used as the metrics label. Recent FastAPI
+# keeps included routes nested, so scope["route"].path lacks the router prefix;
+# older versions copy routes with the full path, which the fallback covers.
+route_templates = {}
+for router, prefix, tags in ROUTERS:
+    app.include_router(router, prefix=prefix, tags=tags)
+    for route in router.routes:
+        route_templates[id(route)] = prefix + route.path
 
 @app.get("/")
 def read_root():
     return {"message": "CredZen Python Backend Running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=settings.PORT, reload=True)
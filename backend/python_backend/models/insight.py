@@ -0,0 +1,26 @@
+from pydantic import BaseModel, field_validator
+from typing import ClassVar, List
+
+def _as_list(value):
+    # Models sometimes return a single string where a list was asked for
+    if isinstance(value, str):
+        return [value]
+    return value
+
+class SmartPickInsights(BaseModel):
+    # Generation budget: two short insights, one advice sentence, two tips
+    MAX_NEW_TOKENS: ClassVar[int] = 300
+
+    spending_insights: List[str]
+    smart_card_usage_advice: str
+    reward_optimization_tips: List[str]
+
+    _coerce_lists = field_validator("spending_insights", "reward_optimization_tips", mode="before")(_as_list)
+
+class FinancialInsights(BaseModel):
+    # Generation budget: three fields of 1-2 short sentences each
+    MAX_NEW_TOKENS: ClassVar[int] = 250
+
+    explanation: str
+    behavioral_context: str
+    long_term_impact: str
@@ -1,33 +1,68 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, Field
+from typing import Annotated, Dict, List, Optional
+import datetime
+from dependencies import get_card_service
 from models.card import Card, CardCreate
-from services.card_service import CardService
+from services.card_service import CardService, encode_json
+from services.forecast_engine import ForecastEngine
 
 router = APIRouter()
-card_service = CardService()
+
+class PaymentPlan(BaseModel):
+    card_id: int
+    amount: Optional[float] = Field(None, ge=0)  # None = pay the statement balance in full
+    day: Optional[int] = Field(None, ge=1, le=31)  # Day of month, defaults to the card's dueDay
+
+class ForecastRequest(BaseModel):
+    daily_spend: float = Field(0, ge=0)
+    card_daily_spend: Dict[int, Annotated[float, Field(ge=0)]] = {}
+    payments: List[PaymentPlan] = []
+    months: int = Field(12, ge=1, le=120)
+    start_date: Optional[datetime.date] = None
+    threshold: float = 30
 
 @router.get("/", response_model=List[Card])
-def read_cards():
-    return card_service.get_all_cards()
+def read_cards(card_service: CardService = Depends(get_card_service)):
+    # Records are validated when stored, so the cached encoding is served as-is;
+    # response_model only documents the schema here.
+    return Response(content=card_service.get_all_cards_json(), media_type="application/json")
 
 @router.post("/", response_model=Card)
-def create_card(card: CardCreate):
-    return card_service.add_card(card)
+def create_card(card: CardCreate, card_service: CardService = Depends(get_card_service)):
+    return Response(content=encode_json(card_service.add_card(card)), media_type="application/json")
 
 @router.put("/{card_id}", response_model=Card)
-def update_card(card_id: int, card: CardCreate):
+def update_card(card_id: int, card: CardCreate, card_service: CardService = Depends(get_card_service)):
     updated_card = card_service.update_card(card_id, card)
     if not updated_card:
         raise HTTPException(status_code=404, detail="Card not found")
-    return updated_card
+    return Response(content=encode_json(updated_card), media_type="application/json")
 
 @router.delete("/{card_id}")
-def delete_card(card_id: int):
+def delete_card(card_id: int, card_service: CardService = Depends(get_card_service)):
     success = card_service.delete_card(card_id)
     if not success:
         raise HTTPException(status_code=404, detail="Card not found")
     return {"message": "Card deleted successfully"}
 
 @router.get("/summary")
-def get_summary():
+def get_summary(card_service: CardService = Depends(get_card_service)):
     return card_service.get_summary()
+
+@router.post("/forecast")
+def forecast_utilization(request: ForecastRequest, card_service: CardService = Depends(get_card_service)):
+    try:
+        forecast = ForecastEngine.forecast_utilization(
+            card_service.get_all_cards(),
+            daily_spend=request.daily_spend,
+            card_daily_spend=request.card_daily_spend,
+            payments=[p.dict() for p in request.payments],
+            months=request.months,
+            start_date=request.start_date,
+            threshold=request.threshold
+        )
+    except ValueError as e:
+        # Stored cards are not range-checked on add
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"cards": forecast}
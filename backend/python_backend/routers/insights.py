@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from dependencies import get_card_service
+from models.insight import SmartPickInsights
+from services.card_service import CardService
+from services.admission import admission
 from services.llm_service import LLMService
+from services.prompts import SMART_PICK_PROMPT
+from services.reward_index import RewardIndex, merchant_category
+from services.response_parser import JSON_OBJECT_STOP, parse_model_output
 
 router = APIRouter()
 
@@ -15,58 +23,60 @@ class AnalysisRequest(BaseModel):
     transactions: List[dict]
     cards: List[dict]
 
-@router.post("/analyze")
+def _reward_index_for(card_service: CardService) -> RewardIndex:
+    # Stored on the partition, so it is dropped together with an evicted partition
+    if card_service.reward_index is None:
+        card_service.reward_index = RewardIndex(card_service)
+    return card_service.reward_index
+
+def get_reward_index(card_service: CardService = Depends(get_card_service)) -> RewardIndex:
+    # One index per user partition
+    return _reward_index_for(card_service)
+
+@router.get("/best-card")
+def best_card(category: Optional[str] = None, merchant: Optional[str] = None,
+              reward_index: RewardIndex = Depends(get_reward_index)):
+    """
+    Point-of-sale lookup: the user's cards ranked by reward rate for a purchase.
+    Pass a reward category (dining, travel, shopping, fuel, bills) or a merchant /
+    category key to classify. No model call is made.
+    """
+    if category:
+        rule_cat = LLMService.rule_category(category)
+    elif merchant:
+        rule_cat = merchant_category(merchant.lower())
+    else:
+        rule_cat = "default"
+    return Response(content=reward_index.lookup(rule_cat), media_type="application/json")
+
+@router.post("/analyze", dependencies=[Depends(admission("smart_pick"))])
 async def analyze_finances(request: AnalysisRequest):
     try:
         # 1. Deterministic Calculation (The "Max Reward Algorithm")
         stats = LLMService.deterministic_card_recommendation(request.transactions)
         
         # 2. AI Qualitative Advice
-        prompt = f"""
-<|system|>
-You are a financial advisor AI for CredZen.
-Your goal is to generate:
-1. "spending_insights": simple text comments about their highest and lowest spending.
-2. "smart_card_usage_advice": You MUST follow this EXACT phrasing: "Use {stats['best_card']} for your next {stats['top_category']} for claiming your {stats['max_reward']} points/cashback."
-3. "reward_optimization_tips": generic tips to save money.
-
-Top Spending Category: {stats['top_category']}
-Best Card: {stats['best_card']}
-Total Potential Reward: {stats['max_reward']}
-
-Return a valid JSON object matching this structure EXACTLY:
-{{
-  "spending_insights": ["Insight 1", "Insight 2"],
-  "smart_card_usage_advice": "Use {stats['best_card']} for your next {stats['top_category']}...",
-  "reward_optimization_tips": ["Tip 1", "Tip 2"]
-}}
-Do NOT wrap in markdown. Return raw JSON.
-</s>
-<|user|>
-Generate insights.
-</s>
-<|assistant|>
-"""
-        ai_response_text = LLMService.generate_insights(prompt)
+        # Bedrock call is blocking; keep it off the event loop
+        ai_response_text = await run_in_threadpool(
+            LLMService.generate_insights, SMART_PICK_PROMPT, stats, SmartPickInsights.MAX_NEW_TOKENS, [JSON_OBJECT_STOP]
+        )
         
-        # Parse JSON from AI response
-        import json
-        try:
-            start = ai_response_text.find('{')
-            end = ai_response_text.rfind('}') + 1
-            ai_data = json.loads(ai_response_text[start:end])
-        except:
-            ai_data = {
-                "spending_insights": ["Spending analysis available."],
-                "smart_card_usage_advice": f"Use {stats['best_card']} for your next {stats['top_category']}.",
-                "reward_optimization_tips": ["Track your spending."]
-            }
+        # Parse JSON from AI response (None: the Bedrock call failed)
+        ai_data = None
+        if ai_response_text is not None:
+            ai_data = parse_model_output(ai_response_text, SmartPickInsights)
+        if ai_data is None:
+            ai_data = SmartPickInsights(
+                spending_insights=["Spending analysis available."],
+                smart_card_usage_advice=f"Use {stats['best_card']} for your next {stats['top_category']}.",
+                reward_optimization_tips=["Track your spending."]
+            )
 
         return {
             "top_spending_categories": [{"category": stats['top_category'], "amount": stats['total_spend'], "percentage": 100}], # Simplified for now
-            "spending_insights": ai_data.get("spending_insights", []),
-            "smart_card_usage_advice": ai_data.get("smart_card_usage_advice", ""),
-            "reward_optimization_tips": ai_data.get("reward_optimization_tips", []),
+            "spending_insights": ai_data.spending_insights,
+            "smart_card_usage_advice": ai_data.smart_card_usage_advice,
+            "reward_optimization_tips": ai_data.reward_optimization_tips,
             "potential_rewards": stats['potential_rewards']
         }
 
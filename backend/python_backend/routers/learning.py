@@ -1,8 +1,16 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import List
+from services.finance_engine import FinanceEngine
 from services.learning_engine import LearningEngine
 
 router = APIRouter()
 
+class CohortRequest(BaseModel):
+    utilization: List[float]
+    missed_payments: List[int]
+
 @router.get("/recommendations")
 async def get_learning_recommendations(utilization: float = 0, risk_level: str = "Low"):
     try:
@@ -10,3 +18,25 @@ async def get_learning_recommendations(utilization: float = 0, risk_level: str =
         return {"modules": recommendations}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/recommendations/batch")
+def get_batch_recommendations(request: CohortRequest):
+    """
+    Scores a cohort in one call. Results are column arrays in request order.
+    """
+    if len(request.utilization) != len(request.missed_payments):
+        raise HTTPException(status_code=400, detail="utilization and missed_payments must have the same length")
+    try:
+        risk = FinanceEngine.assess_risk_batch(request.utilization, request.missed_payments)
+        codes = LearningEngine.get_recommendation_codes(request.utilization, risk["risk_level"])
+
+        levels = FinanceEngine.RISK_LEVELS
+        lesson_sets = LearningEngine.RECOMMENDATION_SETS
+        # Returned directly: the columns are plain lists, so jsonable_encoder is skipped
+        return JSONResponse({
+            "risk_scores": risk["risk_score"].tolist(),
+            "risk_levels": [levels[i] for i in risk["risk_level"].tolist()],
+            "lesson_ids": [lesson_sets[i] for i in codes.tolist()]
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,15 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from services.plaid_service import PlaidService
+from typing import Optional
+import json
+from services.plaid_service import PlaidService, run_in_executor
 
 router = APIRouter()
 
+# Rows per Plaid page (and per streamed chunk) in stream mode
+STREAM_PAGE_SIZE = 100
+
 class LinkTokenRequest(BaseModel):
     user_id: str
 
@@ -13,22 +19,48 @@ class PublicTokenRequest(BaseModel):
 @router.post("/create_link_token")
 async def create_link_token(request: LinkTokenRequest):
     try:
-        return PlaidService.create_link_token(request.user_id)
+        return await run_in_executor(PlaidService.create_link_token, request.user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/exchange_public_token")
 async def exchange_token(request: PublicTokenRequest):
     try:
-        access_token = PlaidService.exchange_public_token(request.public_token)
+        access_token = await run_in_executor(PlaidService.exchange_public_token, request.public_token)
         return {"access_token": access_token}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/transactions")
-async def get_transactions(access_token: str):
+async def get_transactions(
+    access_token: str,
+    start_date: str = "2024-01-01",
+    end_date: str = "2026-02-01",
+    category: Optional[str] = None,
+    card: Optional[str] = None,
+    stream: bool = False,
+):
     try:
-        # Hardcoded date range for MVP
-        return PlaidService.get_transactions(access_token, "2024-01-01", "2026-02-01")
+        # Default date range kept from the MVP
+        if not stream:
+            return await run_in_executor(PlaidService.get_transactions, access_token, start_date, end_date, category, card)
+
+        # Small pages so the first rows go out after one short Plaid call, whatever the
+        # history size. The first page is fetched before responding so Plaid errors still
+        # surface as a 500; later pages are fetched while earlier ones are being sent.
+        pages = PlaidService.iter_transactions(
+            access_token, start_date, end_date, category, card, page_size=STREAM_PAGE_SIZE
+        )
+        first_page = await run_in_executor(next, pages, None)
+
+        async def ndjson():
+            page = first_page
+            while page is not None:
+                # One chunk per page; ensure_ascii=False matches the JSON array response
+                if page:
+                    yield "".join(json.dumps(tx, ensure_ascii=False) + "\n" for tx in page)
+                page = await run_in_executor(next, pages, None)
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
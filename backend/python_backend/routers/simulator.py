@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from services.admission import admission
 from services.finance_engine import FinanceEngine
 
 router = APIRouter()
@@ -9,7 +11,7 @@ class SimulationRequest(BaseModel):
     rate: float
     monthly_payment: float
 
-@router.post("/simulate")
+@router.post("/simulate", dependencies=[Depends(admission("simulator"))])
 async def simulate_debt(request: SimulationRequest):
     try:
         result = FinanceEngine.calculate_amortization(
@@ -36,7 +38,8 @@ async def simulate_debt(request: SimulationRequest):
         }
         
         # Get Nova Insights
-        nova_insights = LLMService.generate_financial_insights(llm_data)
+        # Bedrock call is blocking; keep it off the event loop
+        nova_insights = await run_in_threadpool(LLMService.generate_financial_insights, llm_data)
         
         result["nova_insights"] = nova_insights
         
@@ -0,0 +1,96 @@
+import asyncio
+import math
+import time
+from fastapi import HTTPException
+from config import settings
+from services.metrics import ADMISSION_SHED, timed
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class Lane:
+    """
+    Concurrency cap plus a bounded FIFO wait queue for one expensive route.
+    Routes without a lane are never queued, so cheap endpoints keep priority
+    over AI calls for worker threads and the event loop.
+    """
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, deadline: float,
+                 expected_service_time: float = 2.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.active = 0
+        self.waiting = 0
+        # Moving average of how long an admitted request holds its slot
+        self.service_time = expected_service_time
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def estimated_wait(self) -> float:
+        # Requests ahead of us drain max_concurrent at a time
+        return (self.waiting + 1) / self.max_concurrent * self.service_time
+
+    def _shed(self, reason: str, retry_after: float):
+        ADMISSION_SHED.inc(self.name, reason)
+        raise Overloaded(reason, retry_after)
+
+    async def acquire(self):
+        if self.active < self.max_concurrent and not self.waiting:
+            # Free slot and nobody queued: the semaphore is taken without suspending
+            await self._semaphore.acquire()
+            self.active += 1
+            return
+
+        if self.waiting >= self.max_queue:
+            self._shed("queue_full", self.estimated_wait())
+        # Shed now rather than after waiting out the deadline
+        estimate = self.estimated_wait()
+        if estimate > self.deadline:
+            self._shed("deadline", estimate)
+
+        self.waiting += 1
+        try:
+            with timed("admission", f"{self.name}_wait"):
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self._shed("timeout", self.service_time)
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self, held: float):
+        self.active -= 1
+        self.service_time = 0.8 * self.service_time + 0.2 * held
+        self._semaphore.release()
+
+LANES = {
+    name: Lane(name, settings.AI_MAX_CONCURRENCY, settings.AI_MAX_QUEUE, settings.AI_QUEUE_DEADLINE)
+    for name in ("smart_pick", "simulator")
+}
+
+def admission(lane_name: str):
+    """
+    Route dependency that holds a slot in the named lane for the whole request.
+    Shed requests get a 503 with Retry-After.
+    """
+    lane = LANES[lane_name]
+
+    async def admit():
+        try:
+            await lane.acquire()
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy ({e.reason}), please retry shortly.",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            lane.release(time.perf_counter() - start)
+
+    return admit
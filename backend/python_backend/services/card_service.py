@@ -1,28 +1,83 @@
 import json
 import os
+import re
+import threading
 import time
-from typing import List, Optional
+import weakref
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from config import settings
 from models.card import Card, CardCreate
+from services.metrics import record_cache, timed
 
 DATA_FILE = "data/cards.json"
+# Per-user partitions; the default user keeps the original DATA_FILE
+USER_DATA_DIR = "data/users"
+DEFAULT_USER = "default"
+_USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+def encode_json(obj) -> bytes:
+    # Same output as FastAPI's default JSONResponse
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 class CardService:
-    def __init__(self):
-        self._ensure_data_file()
+    # One CardService (file, lock and caches) per user partition. _partitions
+    # keeps the most recently used ones alive (least recent first); _live finds
+    # an evicted partition that a request is still using, so a user never has
+    # two instances (and two locks) writing the same file.
+    _partitions = OrderedDict()
+    _live = weakref.WeakValueDictionary()
+    _partitions_lock = threading.Lock()
+
+    @staticmethod
+    def is_valid_user_id(user_id: str) -> bool:
+        return bool(_USER_ID_PATTERN.match(user_id or ""))
+
+    @classmethod
+    def for_user(cls, user_id: str) -> "CardService":
+        """
+        Returns the partition for user_id, creating it on first use.
+        Callers must check is_valid_user_id first (the id becomes a file name).
+        """
+        with cls._partitions_lock:
+            service = cls._partitions.get(user_id)
+            if service is not None:
+                cls._partitions.move_to_end(user_id)
+                return service
+            service = cls._live.get(user_id)
+            if service is None:
+                data_file = DATA_FILE if user_id == DEFAULT_USER else os.path.join(USER_DATA_DIR, f"{user_id}.json")
+                service = cls._live[user_id] = cls(data_file)
+            cls._partitions[user_id] = service
+            if len(cls._partitions) > settings.CARD_PARTITION_CACHE_SIZE:
+                cls._partitions.popitem(last=False)
+        return service
 
-    def _ensure_data_file(self):
+    def __init__(self, data_file: str = DATA_FILE):
+        self.data_file = data_file
+        self._lock = threading.Lock()
+        # Validated card records (plain dicts in Card field order), reloaded only
+        # when the data file changes on disk. _version bumps on every change and
+        # keys the encoded-response and summary caches.
+        self._cards = None
+        self._file_stamp = None
+        self._version = 0
+        self._encoded = None
+        self._summary = None
+        # Per-partition RewardIndex, created by routers.insights on first lookup
+        self.reward_index = None
+
+    def _ensure_data_dir(self):
         # Create data directory relative to this file or cwd
         # Assuming run from python_backend cwd
-        os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-        if not os.path.exists(DATA_FILE):
-            with open(DATA_FILE, 'w') as f:
-                json.dump([], f)
+        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
 
+    @timed("card_service", "load")
     def _load_cards(self) -> List[dict]:
-        if not os.path.exists(DATA_FILE):
+        if not os.path.exists(self.data_file):
             return []
         try:
-            with open(DATA_FILE, 'r') as f:
+            with open(self.data_file, 'r') as f:
                 content = f.read().strip()
                 if not content:
                     return []
@@ -32,56 +87,119 @@ class CardService:
             self._save_cards([])
             return []
 
+    @timed("card_service", "save")
     def _save_cards(self, cards: List[dict]):
-        with open(DATA_FILE, 'w') as f:
+        # A missing file reads as no cards, so it is only created on first write
+        self._ensure_data_dir()
+        with open(self.data_file, 'w') as f:
             json.dump(cards, f, indent=2)
 
+    def _current_stamp(self):
+        try:
+            stat = os.stat(self.data_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _records(self) -> List[dict]:
+        # Caller must hold self._lock
+        stamp = self._current_stamp()
+        if self._cards is not None and stamp == self._file_stamp:
+            record_cache("card_store", True)
+            return self._cards
+        record_cache("card_store", False)
+        self._cards = [Card(**c).dict() for c in self._load_cards()]
+        self._file_stamp = self._current_stamp()
+        self._version += 1
+        return self._cards
+
+    def _commit(self, cards: List[dict]):
+        # Caller must hold self._lock
+        self._save_cards(cards)
+        self._cards = cards
+        self._file_stamp = self._current_stamp()
+        self._version += 1
+
+    def snapshot(self) -> Tuple[int, List[dict]]:
+        """
+        Returns (store version, validated records). The records must not be mutated.
+        """
+        with self._lock:
+            cards_data = self._records()
+            return self._version, cards_data
+
     def get_all_cards(self) -> List[Card]:
-        cards_data = self._load_cards()
+        with self._lock:
+            cards_data = self._records()
         return [Card(**c) for c in cards_data]
 
-    def add_card(self, card_create: CardCreate) -> Card:
-        cards = self._load_cards()
-        new_id = int(time.time() * 1000) # Simple ID generation
+    def get_all_cards_json(self) -> bytes:
+        """
+        Returns the card list already encoded as JSON, cached per store version.
+        """
+        with self._lock:
+            cards_data = self._records()
+            if self._encoded is not None and self._encoded[0] == self._version:
+                record_cache("cards_json", True)
+                return self._encoded[1]
+            record_cache("cards_json", False)
+            encoded = encode_json(cards_data)
+            self._encoded = (self._version, encoded)
+            return encoded
+
+    def add_card(self, card_create: CardCreate) -> dict:
+        # CardCreate is already validated, so the record is stored as-is
         new_card_data = card_create.dict()
-        new_card_data['id'] = new_id
-        
-        cards.append(new_card_data)
-        self._save_cards(cards)
+        new_card_data['id'] = int(time.time() * 1000) # Simple ID generation
+
+        with self._lock:
+            cards = list(self._records())
+            cards.append(new_card_data)
+            self._commit(cards)
         
-        return Card(**new_card_data)
-
-    def update_card(self, card_id: int, card_update: CardCreate) -> Optional[Card]:
-        cards = self._load_cards()
-        for i, c in enumerate(cards):
-            if c['id'] == card_id:
-                updated_data = card_update.dict()
-                updated_data['id'] = card_id
-                cards[i] = updated_data
-                self._save_cards(cards)
-                return Card(**updated_data)
+        return new_card_data
+
+    def update_card(self, card_id: int, card_update: CardCreate) -> Optional[dict]:
+        updated_data = card_update.dict()
+        updated_data['id'] = card_id
+
+        with self._lock:
+            cards = list(self._records())
+            for i, c in enumerate(cards):
+                if c['id'] == card_id:
+                    cards[i] = updated_data
+                    self._commit(cards)
+                    return updated_data
         return None
 
     def delete_card(self, card_id: int) -> bool:
-        cards = self._load_cards()
-        initial_len = len(cards)
-        new_cards = [c for c in cards if c['id'] != card_id]
-        if len(new_cards) < initial_len:
-            self._save_cards(new_cards)
-            return True
+        with self._lock:
+            cards = self._records()
+            new_cards = [c for c in cards if c['id'] != card_id]
+            if len(new_cards) < len(cards):
+                self._commit(new_cards)
+                return True
         return False
 
     def get_summary(self):
-        cards = self.get_all_cards()
-        total_limit = sum(c.limit for c in cards)
-        total_balance = sum(c.balance for c in cards)
-        total_available = total_limit - total_balance
-        utilization = (total_balance / total_limit * 100) if total_limit > 0 else 0
-        
-        return {
-            "total_cards": len(cards),
-            "total_limit": total_limit,
-            "total_balance": total_balance,
-            "total_available": total_available,
-            "utilization": round(utilization, 0)
-        }
+        with self._lock:
+            cards = self._records()
+            if self._summary is not None and self._summary[0] == self._version:
+                record_cache("cards_summary", True)
+                return self._summary[1]
+            record_cache("cards_summary", False)
+
+            total_limit = sum(c['limit'] for c in cards)
+            total_balance = sum(c['balance'] for c in cards)
+            total_available = total_limit - total_balance
+            utilization = (total_balance / total_limit * 100) if total_limit > 0 else 0
+            
+            summary = {
+                "total_cards": len(cards),
+                "total_limit": total_limit,
+                "total_balance": total_balance,
+                "total_available": total_available,
+                "utilization": round(utilization, 0)
+            }
+            self._summary = (self._version, summary)
+            return summary
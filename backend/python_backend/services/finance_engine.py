@@ -1,7 +1,12 @@
 import math
+from services.metrics import timed
 
 class FinanceEngine:
+    # Index = risk level code returned by assess_risk_batch
+    RISK_LEVELS = ("Low", "Medium", "High")
+
     @staticmethod
+    @timed("finance_engine", "amortization_schedule")
     def calculate_amortization(principal: float, rate: float, monthly_payment: float):
         """
         Calculates the amortization schedule and total interest for a loan.
@@ -152,3 +157,34 @@ class FinanceEngine:
             "risk_score": min(100, risk_score),
             "risk_level": risk_level
         }
+
+    @staticmethod
+    def assess_risk_batch(utilization, missed_payments):
+        """
+        Vectorized assess_risk for a whole cohort.
+        Args:
+            utilization (array-like of float): Utilization percentage per user.
+            missed_payments (array-like of int): Missed payment count per user.
+
+        Returns:
+            dict: {
+                "risk_score": np.ndarray[int64],
+                "risk_level": np.ndarray[int8] (index into FinanceEngine.RISK_LEVELS)
+            }
+        """
+        import numpy as np
+
+        utilization = np.asarray(utilization, dtype=np.float64)
+        missed_payments = np.asarray(missed_payments, dtype=np.int64)
+        if utilization.shape != missed_payments.shape:
+            raise ValueError("utilization and missed_payments must have the same length")
+
+        # Same thresholds as assess_risk
+        risk_score = np.where(utilization > 70, 50, np.where(utilization > 30, 20, 0))
+        risk_score = risk_score + 30 * np.maximum(missed_payments, 0)
+        risk_level = (risk_score >= 30).astype(np.int8) + (risk_score >= 60)
+
+        return {
+            "risk_score": np.minimum(risk_score, 100),
+            "risk_level": risk_level
+        }
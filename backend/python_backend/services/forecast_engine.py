@@ -0,0 +1,133 @@
+import calendar
+import datetime
+import heapq
+from services.metrics import timed
+
+# Same-day ordering: payments post before the statement closes
+PAYMENT = 0
+STATEMENT = 1
+
+def _day_in_month(year: int, month: int, day: int) -> datetime.date:
+    # Billing/due days past the end of a short month fall on its last day
+    return datetime.date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+def _add_months(date: datetime.date, months: int) -> datetime.date:
+    month_index = date.month - 1 + months
+    return _day_in_month(date.year + month_index // 12, month_index % 12 + 1, date.day)
+
+def _monthly(day: int, start: datetime.date, end: datetime.date):
+    """
+    Yields the ordinal of `day` (day of month) in every month from start to end inclusive.
+    """
+    year, month = start.year, start.month
+    while True:
+        date = _day_in_month(year, month, day)
+        if date > end:
+            return
+        if date >= start:
+            yield date.toordinal()
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+class ForecastEngine:
+    @staticmethod
+    @timed("forecast_engine", "utilization")
+    def forecast_utilization(cards, daily_spend: float = 0, card_daily_spend: dict = None,
+                             payments: list = None, months: int = 12,
+                             start_date: datetime.date = None, threshold: float = 30):
+        """
+        Projects each card's balance across future statement cycles.
+        Spending accrues linearly between events, so the simulation only visits
+        statement and payment dates (one shared event queue for all cards)
+        instead of stepping through every day. Interest is not modelled.
+        Args:
+            cards (list[Card]): Cards with limit, balance, billingDay and dueDay.
+            daily_spend (float): Projected spend per day, per card.
+            card_daily_spend (dict): Per-card override of daily_spend, keyed by card id.
+            payments (list[dict]): {"card_id", "amount", "day"}. amount None pays the
+                last statement balance in full; day None uses the card's dueDay.
+            months (int): Forecast horizon.
+            start_date (date): First day of the forecast (default: today).
+            threshold (float): Utilization % above which a cycle is flagged.
+
+        Returns:
+            list[dict]: One entry per card with its projected statements.
+        """
+        card_daily_spend = card_daily_spend or {}
+        for card in cards:
+            if not (1 <= card.billingDay <= 31 and 1 <= card.dueDay <= 31):
+                raise ValueError(f"Card {card.id} billingDay/dueDay must be between 1 and 31")
+        for plan in payments or []:
+            if plan.get("day") is not None and not 1 <= plan["day"] <= 31:
+                raise ValueError("Payment day must be between 1 and 31")
+        start = start_date or datetime.date.today()
+        end = _add_months(start, months)
+        start_ordinal = start.toordinal()
+
+        balances = [c.balance for c in cards]
+        last_event = [start_ordinal] * len(cards)
+        last_statement = [None] * len(cards)
+        rates = [card_daily_spend.get(c.id, daily_spend) for c in cards]
+        statements = [[] for _ in cards]
+        index_by_id = {c.id: i for i, c in enumerate(cards)}
+
+        # Each stream is an ordered generator of event dates; the heap holds the
+        # next pending event of every stream.
+        streams = []
+        for i, card in enumerate(cards):
+            streams.append((i, STATEMENT, None, _monthly(card.billingDay, start, end)))
+        for plan in payments or []:
+            i = index_by_id.get(plan["card_id"])
+            if i is None:
+                continue
+            day = plan.get("day")
+            if day is None:
+                day = cards[i].dueDay
+            streams.append((i, PAYMENT, plan.get("amount"), _monthly(day, start, end)))
+
+        queue = []
+        for stream_id, (_, kind, _, dates) in enumerate(streams):
+            first = next(dates, None)
+            if first is not None:
+                queue.append((first, kind, stream_id))
+        heapq.heapify(queue)
+
+        while queue:
+            ordinal, kind, stream_id = queue[0]
+            i, _, amount, dates = streams[stream_id]
+
+            balances[i] += rates[i] * (ordinal - last_event[i])
+            last_event[i] = ordinal
+
+            if kind == PAYMENT:
+                due = last_statement[i] if amount is None else amount
+                if due:
+                    balances[i] -= min(due, max(balances[i], 0))
+            else:
+                limit = cards[i].limit
+                utilization = balances[i] / limit * 100 if limit > 0 else 0
+                last_statement[i] = balances[i]
+                statements[i].append({
+                    "statement_date": datetime.date.fromordinal(ordinal).isoformat(),
+                    "statement_balance": round(balances[i], 2),
+                    "utilization": round(utilization, 1),
+                    "above_threshold": utilization > threshold
+                })
+
+            following = next(dates, None)
+            if following is None:
+                heapq.heappop(queue)
+            else:
+                heapq.heapreplace(queue, (following, kind, stream_id))
+
+        return [
+            {
+                "card_id": card.id,
+                "name": card.name,
+                "limit": card.limit,
+                "statements": statements[i],
+                "cycles_above_threshold": sum(s["above_threshold"] for s in statements[i])
+            }
+            for i, card in enumerate(cards)
+        ]
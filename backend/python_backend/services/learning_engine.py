@@ -6,6 +6,10 @@ class LearningEngine:
         4: "Good Debt vs Bad Debt"
     }
 
+    # Every lesson set get_recommendations can produce, indexed by the code from
+    # get_recommendation_codes: bit 0 = utilization > 30, bit 1 = Medium/High risk.
+    RECOMMENDATION_SETS = ([4], [1], [2], [1, 2])
+
     @staticmethod
     def get_recommendations(utilization: float, risk_level: str):
         """
@@ -36,3 +40,25 @@ class LearningEngine:
             })
             
         return recommended_lessons
+
+    @staticmethod
+    def get_recommendation_codes(utilization, risk_level):
+        """
+        Vectorized get_recommendations for a whole cohort.
+        risk_level may hold level names ("Low", "Medium", "High") or the codes
+        from FinanceEngine.assess_risk_batch.
+        Returns a uint8 array of indexes into LearningEngine.RECOMMENDATION_SETS.
+        """
+        import numpy as np
+
+        utilization = np.asarray(utilization, dtype=np.float64)
+        risk_level = np.asarray(risk_level)
+        if utilization.shape != risk_level.shape:
+            raise ValueError("utilization and risk_level must have the same length")
+
+        if risk_level.dtype.kind in "iu":
+            elevated_risk = risk_level >= 1
+        else:
+            elevated_risk = np.isin(risk_level, ("High", "Medium"))
+
+        return (utilization > 30).astype(np.uint8) | (elevated_risk.astype(np.uint8) << 1)
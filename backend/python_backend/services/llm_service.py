@@ -1,49 +1,114 @@
-import httpx
-import boto3
 from config import settings
+from models.insight import FinancialInsights
+from services.metrics import LLM_INVOKE_ERRORS, timed
+from services.prompts import FINANCIAL_INSIGHTS_PROMPT, PromptTemplate
+from services.response_parser import JSON_OBJECT_STOP, parse_model_output
 import json
+import threading
+
+# boto3 is slow to import and to build a client for, so both happen on the
+# first Bedrock call and the client is reused afterwards (it is thread-safe).
+_bedrock_client = None
+_bedrock_lock = threading.Lock()
+
+def get_bedrock_client():
+    """
+    Returns the shared bedrock-runtime client, creating it on first use.
+    """
+    global _bedrock_client
+    if _bedrock_client is None:
+        with _bedrock_lock:
+            if _bedrock_client is None:
+                import boto3
+                _bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
+    return _bedrock_client
 
 class LLMService:
     HF_API_URL = "https://router.huggingface.co/models/HuggingFaceH4/zephyr-7b-beta"
+
+    # Hardcoded rules ported from JS (reward % per rule category)
+    CARD_REWARD_RULES = {
+        "Chase": { "dining": 4, "travel": 4, "shopping": 2, "fuel": 1, "bills": 1, "default": 1 },
+        "Regions": { "dining": 5, "shopping": 5, "bills": 5, "fuel": 2, "travel": 2, "default": 1 },
+        "Bank of america": { "shopping": 5, "dining": 2, "fuel": 2, "bills": 2, "travel": 1, "default": 1 }
+    }
+
+    @staticmethod
+    def rule_category(tx_cat: str) -> str:
+        """
+        Maps a transaction category key (or merchant text) to a reward rule category.
+        """
+        tx_cat = (tx_cat or '').lower()
+        if 'food' in tx_cat or 'dining' in tx_cat: return 'dining'
+        elif 'travel' in tx_cat: return 'travel'
+        elif 'shopping' in tx_cat or 'grocer' in tx_cat: return 'shopping'
+        elif 'fuel' in tx_cat or 'gas' in tx_cat: return 'fuel'
+        elif 'bill' in tx_cat: return 'bills'
+        return 'default'
     
     @staticmethod
-    def generate_insights(prompt: str):
+    def _invoke_nova(template: PromptTemplate, values: dict, max_new_tokens: int, stop_sequences: list = None) -> str:
+        """
+        Returns Nova's output text. Failed calls are counted in
+        credzen_llm_invoke_errors_total and re-raised, so they never reach the
+        response parser (whose metrics only describe model output).
+        """
         try:
-            client = boto3.client("bedrock-runtime", region_name="us-east-1")
-            
-            body = json.dumps({
-                "inferenceConfig": {
-                    "max_new_tokens": 1000
-                },
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ]
-            })
+            return LLMService._call_nova(template, values, max_new_tokens, stop_sequences)
+        except Exception as e:
+            LLM_INVOKE_ERRORS.inc(template.name, type(e).__name__)
+            raise
 
-            model_id = "amazon.nova-micro-v1:0"
-            
-            response = client.invoke_model(
+    @staticmethod
+    def _call_nova(template: PromptTemplate, values: dict, max_new_tokens: int, stop_sequences: list = None) -> str:
+        body = {
+            "system": [
+                {
+                    "text": template.system
+                }
+            ],
+            "inferenceConfig": {
+                "max_new_tokens": max_new_tokens
+            },
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "text": template.render(**values)
+                        }
+                    ]
+                }
+            ]
+        }
+        if stop_sequences:
+            body["inferenceConfig"]["stopSequences"] = stop_sequences
+
+        model_id = "amazon.nova-micro-v1:0"
+        
+        with timed("bedrock", "invoke_model"):
+            response = get_bedrock_client().invoke_model(
                 modelId=model_id,
-                body=body
+                body=json.dumps(body)
             )
 
-            response_body = json.loads(response.get("body").read())
-            output_text = response_body.get("output", {}).get("message", {}).get("content", [])[0].get("text", "")
-            return output_text
-            
+        response_body = json.loads(response.get("body").read())
+        input_tokens = response_body.get("usage", {}).get("inputTokens")
+        if input_tokens is not None:
+            template.record_usage(input_tokens)
+        return response_body.get("output", {}).get("message", {}).get("content", [])[0].get("text", "")
+
+    @staticmethod
+    def generate_insights(template: PromptTemplate, values: dict, max_new_tokens: int = 1000, stop_sequences: list = None):
+        """
+        Returns Nova's output text, or None if the call failed (the caller
+        should use its fallback without parsing).
+        """
+        try:
+            return LLMService._invoke_nova(template, values, max_new_tokens, stop_sequences)
         except Exception as e:
             print(f"Error calling Amazon Nova: {e}")
-            # Return a fallback JSON string so the parser in insights.py doesn't crash completely, 
-            # or just return empty string and let caller handle. 
-            # The caller expects a string containing JSON.
-            return "{}"
+            return None
 
     @staticmethod
     def generate_financial_insights(data: dict):
@@ -51,67 +116,25 @@ class LLMService:
         Generates human-friendly financial insights using Amazon Nova via AWS Bedrock.
         """
         try:
-            client = boto3.client("bedrock-runtime", region_name="us-east-1")
-            
-            prompt = f"""
-            You are a friendly and wise financial assistant named Nova. 
-            Analyze the following financial data for a user's loan/debt scenario (all values in Indian Rupees - ₹):
-            
-            - Monthly Payment (EMI): ₹{data.get('payment', 0)}
-            - Total Interest Payable: ₹{data.get('total_interest', 0)}
-            - Time to Debt Freedom: {data.get('months_to_pay_off', 0)} months
-            - Current Utilization: {data.get('utilization', 0)}% (if applicable)
-
-            
-            Your task is to provide VERY CONCISE (max 1-2 short sentences each) insights:
-            1. **Human-Friendly Explanation**: What these numbers mean in simple terms.
-            2. **Behavioral Context**: A quick RELATABLE analogy or nudge.
-            3. **Long-Term Impact**: The key financial takeaway.
-            
-            Output the response in a clear, structured JSON format with keys: "explanation", "behavioral_context", "long_term_impact".
-            Do not use markdown formatting for the JSON. Just return the raw JSON object.
-            Be extremely brief.
-            """
-
-            
-            body = json.dumps({
-                "inferenceConfig": {
-                    "max_new_tokens": 1000
-                },
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ]
-            })
-
-            model_id = "amazon.nova-micro-v1:0"
-            
-            response = client.invoke_model(
-                modelId=model_id,
-                body=body
+            values = {
+                "payment": data.get('payment', 0),
+                "total_interest": data.get('total_interest', 0),
+                "months_to_pay_off": data.get('months_to_pay_off', 0),
+                "utilization": data.get('utilization', 0)
+            }
+            output_text = LLMService._invoke_nova(
+                FINANCIAL_INSIGHTS_PROMPT, values, FinancialInsights.MAX_NEW_TOKENS, [JSON_OBJECT_STOP]
             )
-
-            response_body = json.loads(response.get("body").read())
-            output_text = response_body.get("output", {}).get("message", {}).get("content", [])[0].get("text", "")
             
-            # Attempt to parse JSON from the output
-            try:
-                start = output_text.find('{')
-                end = output_text.rfind('}') + 1
-                return json.loads(output_text[start:end])
-            except:
-                # Fallback if JSON parsing fails
-                return {
-                    "explanation": output_text,
-                    "behavioral_context": "Could not parse specific context.",
-                    "long_term_impact": "Could not parse specific impact."
-                }
+            insights = parse_model_output(output_text, FinancialInsights)
+            if insights is not None:
+                return insights.dict()
+            # Fallback if JSON parsing fails
+            return {
+                "explanation": "Nova's analysis could not be read this time.",
+                "behavioral_context": "Could not parse specific context.",
+                "long_term_impact": "Could not parse specific impact."
+            }
                 
         except Exception as e:
             print(f"Error calling Amazon Nova: {e}")
@@ -122,16 +145,12 @@ class LLMService:
             }
 
     @staticmethod
+    @timed("rewards", "card_recommendation")
     def deterministic_card_recommendation(transactions: list):
         """
         Ported from Node.js: Calculates max reward card based on spending.
         """
-        # Hardcoded rules ported from JS
-        card_reward_rules = {
-            "Chase": { "dining": 4, "travel": 4, "shopping": 2, "fuel": 1, "bills": 1, "default": 1 },
-            "Regions": { "dining": 5, "shopping": 5, "bills": 5, "fuel": 2, "travel": 2, "default": 1 },
-            "Bank of america": { "shopping": 5, "dining": 2, "fuel": 2, "bills": 2, "travel": 1, "default": 1 }
-        }
+        card_reward_rules = LLMService.CARD_REWARD_RULES
 
         category_totals = {}
         total_spend = 0
@@ -145,13 +164,7 @@ class LLMService:
                 total_spend += amount
                 
                 # Determine rule category
-                tx_cat = (tx.get('category_key') or '').lower()
-                rule_cat = 'default'
-                if 'food' in tx_cat or 'dining' in tx_cat: rule_cat = 'dining'
-                elif 'travel' in tx_cat: rule_cat = 'travel'
-                elif 'shopping' in tx_cat or 'grocer' in tx_cat: rule_cat = 'shopping'
-                elif 'fuel' in tx_cat or 'gas' in tx_cat: rule_cat = 'fuel'
-                elif 'bill' in tx_cat: rule_cat = 'bills'
+                rule_cat = LLMService.rule_category(tx.get('category_key'))
                 
                 # Calculate rewards
                 for card, rules in card_reward_rules.items():
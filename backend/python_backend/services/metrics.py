@@ -0,0 +1,167 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Prometheus default buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Spans recorded while handling the current request, read by the Server-Timing middleware
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, ("le", bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-2]}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+REQUEST_DURATION = Histogram(
+    "credzen_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+COMPONENT_DURATION = Histogram(
+    "credzen_component_duration_seconds",
+    "Latency of upstream calls (Bedrock, Plaid) and internal hot paths.",
+    ("component", "operation"),
+)
+CACHE_REQUESTS = Counter(
+    "credzen_cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss).",
+    ("cache", "result"),
+)
+
+ADMISSION_SHED = Counter(
+    "credzen_admission_shed_total",
+    "Requests rejected with 503 by admission control, by lane and reason.",
+    ("lane", "reason"),
+)
+
+LLM_PARSE_RESULTS = Counter(
+    "credzen_llm_parse_total",
+    "Model output parse outcomes by schema (ok, repaired, failed, empty).",
+    ("schema", "result"),
+)
+
+LLM_INVOKE_ERRORS = Counter(
+    "credzen_llm_invoke_errors_total",
+    "Bedrock calls that raised (outage, throttling, unreadable response), by template and exception type.",
+    ("template", "error"),
+)
+
+PROMPT_INPUT_TOKENS = Histogram(
+    "credzen_llm_input_tokens",
+    "Prompt size in tokens by template (estimated before sending, reported by Bedrock).",
+    ("template", "source"),
+    buckets=(50, 100, 200, 300, 400, 600, 800, 1200, 1600, 3200),
+)
+PROMPT_OVER_BUDGET = Counter(
+    "credzen_llm_prompt_over_budget_total",
+    "Rendered prompts whose estimated size exceeded the template's token budget.",
+    ("template",),
+)
+
+REGISTRY = [
+    REQUEST_DURATION, COMPONENT_DURATION, CACHE_REQUESTS, ADMISSION_SHED,
+    LLM_PARSE_RESULTS, LLM_INVOKE_ERRORS, PROMPT_INPUT_TOKENS, PROMPT_OVER_BUDGET,
+]
+
+@contextmanager
+def timed(component: str, operation: str):
+    """
+    Times the enclosed block into credzen_component_duration_seconds and,
+    inside a request, adds it to that request's Server-Timing header.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        COMPONENT_DURATION.observe(elapsed, component, operation)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((f"{component}-{operation}", elapsed))
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+def start_request():
+    """
+    Starts collecting spans for the current request. Returns the span list.
+    """
+    spans = []
+    _request_spans.set(spans)
+    return spans
+
+def server_timing_header(spans, total: float) -> str:
+    entries = [f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in spans]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
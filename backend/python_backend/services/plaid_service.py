@@ -1,30 +1,63 @@
-import plaid
-from plaid.api import plaid_api
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.transactions_get_request import TransactionsGetRequest
-from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
-from plaid.model.accounts_get_request import AccountsGetRequest
-from plaid.model.products import Products
-from plaid.model.country_code import CountryCode
 from config import settings
+from services.metrics import timed
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
 import datetime
+import functools
+import threading
 
-# Initialize Plaid Client
-configuration = plaid.Configuration(
-    host=plaid.Environment.Sandbox if settings.PLAID_ENV == 'sandbox' else plaid.Environment.Development,
-    api_key={
-        'clientId': settings.PLAID_CLIENT_ID,
-        'secret': settings.PLAID_SECRET,
-    }
-)
-api_client = plaid.ApiClient(configuration)
-client = plaid_api.PlaidApi(api_client)
+# The Plaid SDK is synchronous, so calls run on a dedicated bounded pool instead
+# of the event loop. The urllib3 pool is sized to match so workers never wait
+# on a connection.
+# The plaid package (and its generated model modules) is imported inside the
+# functions below so that app startup does not pay for it.
+_executor = ThreadPoolExecutor(max_workers=settings.PLAID_MAX_WORKERS, thread_name_prefix="plaid")
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Returns the shared Plaid client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if not settings.PLAID_CLIENT_ID or not settings.PLAID_SECRET:
+                    raise RuntimeError("Plaid credentials are not configured (PLAID_CLIENT_ID / PLAID_SECRET).")
+                import plaid
+                from plaid.api import plaid_api
+
+                configuration = plaid.Configuration(
+                    host=plaid.Environment.Sandbox if settings.PLAID_ENV == 'sandbox' else plaid.Environment.Development,
+                    api_key={
+                        'clientId': settings.PLAID_CLIENT_ID,
+                        'secret': settings.PLAID_SECRET,
+                    }
+                )
+                configuration.connection_pool_maxsize = settings.PLAID_MAX_WORKERS
+                _client = plaid_api.PlaidApi(plaid.ApiClient(configuration))
+    return _client
+
+async def run_in_executor(func, *args):
+    """
+    Runs a blocking PlaidService call on the Plaid pool and awaits the result.
+    The caller's context is carried over so timings reach the request's Server-Timing.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, func, *args))
 
 class PlaidService:
     @staticmethod
     def create_link_token(user_id: str):
+        from plaid.model.link_token_create_request import LinkTokenCreateRequest
+        from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+        from plaid.model.products import Products
+        from plaid.model.country_code import CountryCode
+
         request = LinkTokenCreateRequest(
             products=[Products('transactions')],
             client_name="CredZen",
@@ -34,66 +67,116 @@ class PlaidService:
                 client_user_id=user_id
             )
         )
-        response = client.link_token_create(request)
+        with timed("plaid", "link_token_create"):
+            response = get_client().link_token_create(request)
         return response.to_dict()
 
     @staticmethod
     def exchange_public_token(public_token: str):
+        from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+
         request = ItemPublicTokenExchangeRequest(
             public_token=public_token
         )
-        response = client.item_public_token_exchange(request)
+        with timed("plaid", "item_public_token_exchange"):
+            response = get_client().item_public_token_exchange(request)
         return response.to_dict()['access_token']
 
     @staticmethod
-    def get_transactions(access_token: str, start_date: str, end_date: str):
-        # 1. Fetch Accounts to map IDs to Names
-        accounts_request = AccountsGetRequest(access_token=access_token)
-        accounts_response = client.accounts_get(accounts_request)
-        accounts = accounts_response.to_dict()['accounts']
-        
+    def account_map(accounts: list) -> dict:
         # Use official_name if available (e.g. "Plaid Gold Standard..."), else name (e.g. "Credit Card")
         account_map = {}
         for acc in accounts:
             name = acc.get('official_name') or acc.get('name') or "Unknown Account"
             mask = acc.get('mask') or "...."
             account_map[acc['account_id']] = f"{name} ({mask})"
+        return account_map
+
+    @staticmethod
+    def iter_transaction_pages(access_token: str, start_date: str, end_date: str, page_size: int = 500):
+        """
+        Pages through transactions_get with `offset`, yielding (accounts, raw_transactions)
+        per page as each response arrives. Every response carries the accounts, so no
+        separate accounts_get round trip is needed.
+        """
+        from plaid.model.transactions_get_request import TransactionsGetRequest
+        from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
 
-        # 2. Fetch Transactions
-        request = TransactionsGetRequest(
-            access_token=access_token,
-            start_date=datetime.date.fromisoformat(start_date),
-            end_date=datetime.date.fromisoformat(end_date),
-            options=TransactionsGetRequestOptions(
-                count=500,
-                offset=0
+        offset = 0
+        while True:
+            # The date range is applied by Plaid itself
+            request = TransactionsGetRequest(
+                access_token=access_token,
+                start_date=datetime.date.fromisoformat(start_date),
+                end_date=datetime.date.fromisoformat(end_date),
+                options=TransactionsGetRequestOptions(
+                    count=page_size,
+                    offset=offset
+                )
             )
-        )
-        response = client.transactions_get(request)
-        raw_transactions = response.to_dict()['transactions']
+            with timed("plaid", "transactions_get"):
+                response = get_client().transactions_get(request).to_dict()
+
+            raw_transactions = response['transactions']
+            yield response['accounts'], raw_transactions
+
+            offset += len(raw_transactions)
+            if not raw_transactions or offset >= response['total_transactions']:
+                return
+
+    @staticmethod
+    def iter_transactions(access_token: str, start_date: str, end_date: str,
+                          category: str = None, card: str = None, page_size: int = 500):
+        """
+        Yields one list of formatted (and filtered) transactions per Plaid page.
+        """
+        account_map = None
+        for accounts, raw_transactions in PlaidService.iter_transaction_pages(access_token, start_date, end_date, page_size):
+            if account_map is None:
+                account_map = PlaidService.account_map(accounts)
+            yield list(PlaidService.format_transactions(raw_transactions, account_map, category, card))
+
+    @staticmethod
+    def format_transactions(raw_transactions: list, account_map: dict, category: str = None, card: str = None):
+        """
+        Lazily formats raw Plaid transactions for the frontend.
+        Optional filters are applied here so skipped rows are never built:
+            category: case-insensitive match on category or category_label.
+            card: case-insensitive substring match on the card display name.
+        """
+        category_filter = category.lower() if category else None
+        card_filter = card.lower() if card else None
 
-        # 3. Format for Frontend
-        formatted_transactions = []
         for tx in raw_transactions:
+            card_name = account_map.get(tx['account_id'], "Unknown Card")
+            if card_filter and card_filter not in card_name.lower():
+                continue
+
             # Better categorization logic
-            category = "Uncategorized"
+            tx_category = "Uncategorized"
             category_label = "General"
             
             if tx.get('personal_finance_category'):
-                category = tx['personal_finance_category']['primary']
+                tx_category = tx['personal_finance_category']['primary']
                 # Convert LOAN_PAYMENTS_CREDIT_CARD_PAYMENT -> Loan Payments Credit Card Payment
                 category_label = tx['personal_finance_category']['detailed'].replace('_', ' ').title()
             elif tx.get('category') and len(tx['category']) > 0:
-                category = tx['category'][0]
+                tx_category = tx['category'][0]
                 category_label = tx['category'][-1]
 
-            formatted_transactions.append({
+            if category_filter and category_filter not in (tx_category.lower(), category_label.lower()):
+                continue
+
+            yield {
                 "date": str(tx['date']),
                 "merchant": tx['name'],
                 "amount": tx['amount'],
-                "category": category,
+                "category": tx_category,
                 "category_label": category_label,
-                "card": account_map.get(tx['account_id'], "Unknown Card")
-            })
+                "card": card_name
+            }
 
-        return formatted_transactions
+    @staticmethod
+    def get_transactions(access_token: str, start_date: str, end_date: str, category: str = None, card: str = None):
+        pages = PlaidService.iter_transactions(access_token, start_date, end_date, category, card)
+        return [tx for page in pages for tx in page]
@@ -0,0 +1,79 @@
+import math
+from services.metrics import PROMPT_INPUT_TOKENS, PROMPT_OVER_BUDGET
+
+def _compact(text: str) -> str:
+    # Drop indentation, runs of spaces, blank lines and markdown emphasis; none
+    # of it changes the instructions but all of it costs input tokens.
+    lines = (" ".join(line.replace("**", "").split()) for line in text.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough pre-send token count (~4 characters per token for English text).
+    The exact count is taken from Bedrock's usage block after each call.
+    """
+    return math.ceil(len(text) / 4)
+
+class PromptTemplate:
+    """
+    A prompt compiled once at import: the static instructions go in Nova's
+    system field, and only the short per-request user text is formatted.
+    """
+    def __init__(self, name: str, system: str, user: str, max_input_tokens: int):
+        self.name = name
+        self.system = _compact(system)
+        self.user = _compact(user)
+        self.max_input_tokens = max_input_tokens
+        self._system_tokens = estimate_tokens(self.system)
+
+    def render(self, **values) -> str:
+        """
+        Returns the user message, recording its estimated size against the budget.
+        """
+        user = self.user.format(**values)
+        tokens = self._system_tokens + estimate_tokens(user)
+        PROMPT_INPUT_TOKENS.observe(tokens, self.name, "estimated")
+        if tokens > self.max_input_tokens:
+            PROMPT_OVER_BUDGET.inc(self.name)
+            print(f"Prompt '{self.name}' is ~{tokens} tokens, over its {self.max_input_tokens} budget")
+        return user
+
+    def record_usage(self, input_tokens: int):
+        PROMPT_INPUT_TOKENS.observe(input_tokens, self.name, "reported")
+
+SMART_PICK_PROMPT = PromptTemplate(
+    "smart_pick",
+    system="""
+        You are a financial advisor AI for CredZen.
+        Return only a raw JSON object (no markdown) with exactly these keys:
+        "spending_insights": list of short comments on their highest and lowest spending,
+        "smart_card_usage_advice": one sentence, using the exact phrasing given by the user,
+        "reward_optimization_tips": list of short generic money-saving tips.
+    """,
+    user="""
+        Top Spending Category: {top_category}
+        Best Card: {best_card}
+        Total Potential Reward: {max_reward}
+        smart_card_usage_advice must be exactly: "Use {best_card} for your next {top_category} for claiming your {max_reward} points/cashback."
+    """,
+    max_input_tokens=300,
+)
+
+FINANCIAL_INSIGHTS_PROMPT = PromptTemplate(
+    "financial_insights",
+    system="""
+        You are Nova, a friendly and wise financial assistant.
+        Given a user's loan/debt scenario (values in Indian Rupees - ₹), give VERY CONCISE insights, max 1-2 short sentences each:
+        "explanation": what the numbers mean in simple terms,
+        "behavioral_context": a quick relatable analogy or nudge,
+        "long_term_impact": the key financial takeaway.
+        Return only a raw JSON object (no markdown) with exactly those keys. Be extremely brief.
+    """,
+    user="""
+        - Monthly Payment (EMI): ₹{payment}
+        - Total Interest Payable: ₹{total_interest}
+        - Time to Debt Freedom: {months_to_pay_off} months
+        - Current Utilization: {utilization}% (if applicable)
+    """,
+    max_input_tokens=300,
+)
@@ -0,0 +1,95 @@
+import json
+import re
+from typing import Optional, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+from services.metrics import LLM_PARSE_RESULTS
+
+T = TypeVar("T", bound=BaseModel)
+
+# Ends a pretty-printed top-level JSON object. Generation stops there and the
+# stop sequence is not part of the output, so the parser appends it back.
+JSON_OBJECT_STOP = "\n}"
+
+_decoder = json.JSONDecoder()
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = "“”"
+_MAX_CANDIDATES = 3
+
+def _decode_object(text: str, start: int) -> Optional[dict]:
+    # raw_decode parses in place from `start` and ignores trailing prose
+    try:
+        value, _ = _decoder.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+def _repair(fragment: str) -> str:
+    """
+    Fixes the usual model mistakes: smart quotes used as JSON delimiters,
+    trailing commas, and output cut off by the token limit (unclosed
+    strings/brackets). Smart quotes inside string values are left as text.
+    """
+    out = []
+    closers = []
+    opened_by = None  # Quote that opened the current string, None outside strings
+    escaped = False
+    for ch in fragment:
+        if opened_by is not None:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"' or (opened_by != '"' and ch in _SMART_QUOTES):
+                opened_by = None
+                ch = '"'
+        elif ch == '"' or ch in _SMART_QUOTES:
+            opened_by = ch
+            ch = '"'
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]" and closers:
+            closers.pop()
+        out.append(ch)
+
+    fragment = "".join(out)
+    if opened_by is not None:
+        fragment += '"'
+    fragment = fragment.rstrip().rstrip(",")
+    return _TRAILING_COMMA.sub(r"\1", fragment + "".join(reversed(closers)))
+
+def _validate(data: Optional[dict], schema: Type[T]) -> Optional[T]:
+    if data is None:
+        return None
+    try:
+        return schema(**data)
+    except ValidationError:
+        return None
+
+def parse_model_output(text: str, schema: Type[T]) -> Optional[T]:
+    """
+    Extracts the first JSON object in `text` that validates against `schema`.
+    Returns None if nothing usable is found. Outcomes are counted per schema
+    in credzen_llm_parse_total (ok, repaired, failed, empty); an object that
+    only lacks the JSON_OBJECT_STOP it was stopped at counts as ok.
+    """
+    name = schema.__name__
+    if not text or not text.strip():
+        LLM_PARSE_RESULTS.inc(name, "empty")
+        return None
+
+    start = text.find("{")
+    for _ in range(_MAX_CANDIDATES):
+        if start < 0:
+            break
+        parsed, result = _validate(_decode_object(text, start), schema), "ok"
+        if parsed is None:
+            parsed = _validate(_decode_object(text[start:].rstrip() + JSON_OBJECT_STOP, 0), schema)
+        if parsed is None:
+            parsed, result = _validate(_decode_object(_repair(text[start:]), 0), schema), "repaired"
+        if parsed is not None:
+            LLM_PARSE_RESULTS.inc(name, result)
+            return parsed
+        start = text.find("{", start + 1)
+
+    LLM_PARSE_RESULTS.inc(name, "failed")
+    return None
@@ -0,0 +1,76 @@
+import threading
+from functools import lru_cache
+from services.card_service import CardService, encode_json
+from services.llm_service import LLMService
+from services.metrics import record_cache
+
+# Cards with no matching reward rule earn the base rate everywhere
+BASE_RULE = {"default": 1}
+
+@lru_cache(maxsize=4096)
+def merchant_category(merchant: str) -> str:
+    return LLMService.rule_category(merchant)
+
+class RewardIndex:
+    """
+    Precomputed rule category -> user's cards ranked by reward rate.
+    Each entry is stored already JSON-encoded, so a lookup is one dict access.
+    Rebuilt only when the card store version changes; the reward rules are a
+    class constant, so rule edits take effect on restart.
+    """
+    def __init__(self, card_service: CardService):
+        self._card_service = card_service
+        self._lock = threading.Lock()
+        # (card store version, index), swapped as one object so a reader never
+        # pairs a new version with the previous index
+        self._state = (None, {})
+
+    @staticmethod
+    def _rules_for(card_name: str, rules: dict) -> dict:
+        name = card_name.lower()
+        for issuer, issuer_rules in rules.items():
+            if issuer.lower() in name:
+                return issuer_rules
+        return BASE_RULE
+
+    @staticmethod
+    def build(cards: list, rules: dict) -> dict:
+        categories = {cat for issuer_rules in rules.values() for cat in issuer_rules}
+        card_rules = [(c, RewardIndex._rules_for(c['name'], rules)) for c in cards]
+
+        index = {}
+        for category in categories:
+            ranked = sorted(
+                (
+                    {
+                        "card_id": c['id'],
+                        "name": c['name'],
+                        "lastFour": c['lastFour'],
+                        "reward_rate": card_rule.get(category, card_rule['default'])
+                    }
+                    for c, card_rule in card_rules
+                ),
+                key=lambda entry: entry["reward_rate"],
+                reverse=True
+            )
+            index[category] = encode_json({"category": category, "cards": ranked})
+        return index
+
+    def lookup(self, category: str) -> bytes:
+        """
+        Returns the encoded ranking for a rule category (unknown -> "default").
+        """
+        version, cards = self._card_service.snapshot()
+
+        built_version, index = self._state
+        if built_version != version:
+            with self._lock:
+                built_version, index = self._state
+                if built_version != version:
+                    record_cache("reward_index", False)
+                    index = RewardIndex.build(cards, LLMService.CARD_REWARD_RULES)
+                    self._state = (version, index)
+        else:
+            record_cache("reward_index", True)
+
+        return index.get(category) or index["default"]
@@ -0,0 +1,51 @@
+import gc
+import weakref
+from collections import OrderedDict
+
+import pytest
+
+from config import settings
+from models.card import CardCreate
+from routers import insights
+from services import card_service
+from services.card_service import CardService
+
+@pytest.fixture(autouse=True)
+def partitions(tmp_path, monkeypatch):
+    monkeypatch.setattr(card_service, "USER_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "CARD_PARTITION_CACHE_SIZE", 1)
+    monkeypatch.setattr(CardService, "_partitions", OrderedDict())
+    return tmp_path
+
+def new_card(name="Chase Freedom"):
+    return CardCreate(name=name, lastFour="1234", type="Visa", limit=1000,
+                      balance=0, billingDay=1, dueDay=20)
+
+def test_evicted_partition_in_use_is_reused():
+    alice = CardService.for_user("alice")
+    CardService.for_user("bob")  # Evicts alice from the LRU while a request still holds her
+    assert CardService.for_user("alice") is alice
+
+def test_unused_partition_is_released(partitions):
+    alice = CardService.for_user("alice")
+    alice.add_card(new_card())
+    index = insights._reward_index_for(alice)
+    assert insights._reward_index_for(alice) is index
+
+    index_ref = weakref.ref(index)
+    del alice, index
+    CardService.for_user("bob")
+    gc.collect()
+    assert "alice" not in CardService._live
+    assert index_ref() is None
+    # Reloaded from the shard on next use
+    assert [c.name for c in CardService.for_user("alice").get_all_cards()] == ["Chase Freedom"]
+
+def test_reads_do_not_create_shards(partitions):
+    service = CardService.for_user("carol")
+    assert service.get_all_cards() == []
+    assert service.get_summary()["total_cards"] == 0
+    assert not (partitions / "carol.json").exists()
+
+    service.add_card(new_card())
+    assert (partitions / "carol.json").exists()
@@ -0,0 +1,69 @@
+import datetime
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from services.forecast_engine import ForecastEngine, _add_months, _day_in_month
+
+def make_card(card_id=1, limit=5000, balance=0, billing_day=15, due_day=5):
+    return SimpleNamespace(id=card_id, name=f"Card {card_id}", limit=limit, balance=balance,
+                           billingDay=billing_day, dueDay=due_day)
+
+def brute_force_statements(card, daily_spend, start, months):
+    """
+    Reference day-by-day simulation: spend accrues every day after `start`, the
+    statement balance is paid in full on the due day, payments post before the
+    statement closes on the same day.
+    """
+    end = _add_months(start, months)
+    balance = card.balance
+    last_statement = None
+    statements = []
+    day = start
+    while day <= end:
+        if day != start:
+            balance += daily_spend
+        if day == _day_in_month(day.year, day.month, card.dueDay) and last_statement:
+            balance -= min(last_statement, max(balance, 0))
+        if day == _day_in_month(day.year, day.month, card.billingDay):
+            last_statement = balance
+            statements.append(round(balance, 2))
+        day += datetime.timedelta(days=1)
+    return statements
+
+def test_matches_brute_force_daily_loop():
+    rng = random.Random(7)
+    for _ in range(200):
+        card = make_card(balance=rng.uniform(0, 3000), billing_day=rng.randint(1, 31), due_day=rng.randint(1, 31))
+        start = datetime.date(2024, rng.randint(1, 12), rng.randint(1, 28))
+        daily_spend = rng.uniform(0, 50)
+
+        forecast = ForecastEngine.forecast_utilization(
+            [card], daily_spend=daily_spend,
+            payments=[{"card_id": card.id, "amount": None, "day": None}],
+            months=14, start_date=start
+        )
+        projected = [s["statement_balance"] for s in forecast[0]["statements"]]
+        assert projected == brute_force_statements(card, daily_spend, start, 14)
+
+def test_flags_cycles_above_threshold():
+    card = make_card(limit=1000, balance=100, billing_day=31, due_day=20)
+    forecast = ForecastEngine.forecast_utilization(
+        [card], daily_spend=10, payments=[{"card_id": 1, "amount": None, "day": None}],
+        months=4, start_date=datetime.date(2025, 1, 1)
+    )
+    statements = forecast[0]["statements"]
+    # Billing day 31 falls on the last day of short months
+    assert [s["statement_date"] for s in statements] == ["2025-01-31", "2025-02-28", "2025-03-31", "2025-04-30"]
+    assert [s["above_threshold"] for s in statements] == [True, False, True, False]
+    assert forecast[0]["cycles_above_threshold"] == 2
+
+@pytest.mark.parametrize("billing_day, due_day", [(0, 5), (32, 5), (15, -3)])
+def test_rejects_card_days_outside_month(billing_day, due_day):
+    with pytest.raises(ValueError):
+        ForecastEngine.forecast_utilization([make_card(billing_day=billing_day, due_day=due_day)])
+
+def test_rejects_payment_day_outside_month():
+    with pytest.raises(ValueError):
+        ForecastEngine.forecast_utilization([make_card()], payments=[{"card_id": 1, "amount": None, "day": 0}])
@@ -0,0 +1,22 @@
+import httpx
+import asyncio
+
+async def test_metrics():
+    base_url = "http://localhost:8000"
+
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        print("\n1. Testing Server-Timing header on GET /api/cards/summary")
+        res = await client.get(f"{base_url}/api/cards/summary")
+        print(f"Status: {res.status_code}, Server-Timing: {res.headers.get('server-timing')}")
+
+        print("\n2. Testing GET /metrics")
+        res = await client.get(f"{base_url}/metrics")
+        if res.status_code != 200:
+            print(f"Error fetching metrics: {res.status_code}, Body: {res.text}")
+            return
+        counts = [line for line in res.text.splitlines() if "_count" in line]
+        print(f"Status: {res.status_code}, Series:")
+        print("\n".join(counts))
+
+if __name__ == "__main__":
+    asyncio.run(test_metrics())
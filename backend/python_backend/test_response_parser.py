@@ -0,0 +1,69 @@
+from models.insight import FinancialInsights, SmartPickInsights
+from services.metrics import LLM_PARSE_RESULTS
+from services.response_parser import JSON_OBJECT_STOP, parse_model_output
+
+def parse_count(schema, result):
+    return LLM_PARSE_RESULTS._values.get((schema.__name__, result), 0)
+
+def parse_and_classify(text, schema=FinancialInsights):
+    before = {r: parse_count(schema, r) for r in ("ok", "repaired", "failed", "empty")}
+    parsed = parse_model_output(text, schema)
+    changed = [r for r in before if parse_count(schema, r) != before[r]]
+    assert len(changed) == 1
+    return parsed, changed[0]
+
+PRETTY = """{
+  "explanation": "Think of it as a “debt snowball”",
+  "behavioral_context": "Small wins keep you going.",
+  "long_term_impact": "You save ₹12,000 in interest."
+}"""
+
+def test_complete_object_is_ok():
+    parsed, result = parse_and_classify(PRETTY)
+    assert result == "ok"
+    assert parsed.explanation == "Think of it as a “debt snowball”"
+
+def test_output_cut_at_stop_sequence_is_ok():
+    # Bedrock returns the text up to, but not including, the stop sequence
+    truncated = PRETTY[:PRETTY.rindex(JSON_OBJECT_STOP)]
+    parsed, result = parse_and_classify(truncated)
+    assert result == "ok"
+    assert parsed.explanation == "Think of it as a “debt snowball”"
+    assert parsed.long_term_impact == "You save ₹12,000 in interest."
+
+def test_smart_quote_delimiters_are_repaired_but_values_kept():
+    text = '{“explanation”: “Pay the smallest debt first.”, "behavioral_context": "It is a “debt snowball”", "long_term_impact": "y"}'
+    parsed, result = parse_and_classify(text)
+    assert result == "repaired"
+    assert parsed.explanation == "Pay the smallest debt first."
+    assert parsed.behavioral_context == "It is a “debt snowball”"
+
+def test_trailing_commas_are_repaired():
+    text = '{"spending_insights": ["a", "b",], "smart_card_usage_advice": "Use X", "reward_optimization_tips": "tip",}'
+    parsed, result = parse_and_classify(text, SmartPickInsights)
+    assert result == "repaired"
+    assert parsed.spending_insights == ["a", "b"]
+    assert parsed.reward_optimization_tips == ["tip"]
+
+def test_prose_and_code_fences_around_json():
+    text = "Sure! Here are your insights:\n```json\n" + PRETTY + "\n```\nLet me know if you need more."
+    parsed, result = parse_and_classify(text)
+    assert result == "ok"
+    assert parsed.behavioral_context == "Small wins keep you going."
+
+def test_code_fence_cut_at_stop_sequence():
+    text = "```json\n" + PRETTY[:PRETTY.rindex(JSON_OBJECT_STOP)]
+    parsed, result = parse_and_classify(text)
+    assert result == "ok"
+    assert parsed.long_term_impact == "You save ₹12,000 in interest."
+
+def test_cut_off_by_token_limit_is_repaired():
+    text = PRETTY[:PRETTY.index("in interest")]
+    parsed, result = parse_and_classify(text)
+    assert result == "repaired"
+    assert parsed.long_term_impact == "You save ₹12,000 "
+
+def test_empty_and_unusable_output():
+    assert parse_and_classify("   ") == (None, "empty")
+    assert parse_and_classify("I cannot help with that.") == (None, "failed")
+    assert parse_and_classify('{"unrelated": true}') == (None, "failed")
@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+
+import main
+
+def test_request_metrics_use_full_route_template():
+    client = TestClient(main.app)
+    assert client.get("/api/cards/summary").status_code == 200
+    assert client.get("/").status_code == 200
+
+    body = client.get("/metrics").text
+    assert 'method="GET",route="/api/cards/summary",status="200"' in body
+    assert 'method="GET",route="/",status="200"' in body
+    assert 'route="/summary"' not in body
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+# Heavy SDKs that must only be imported on first use, never at app startup
+LAZY_MODULES = ["plaid", "boto3", "botocore", "httpx", "numpy", "pandas"]
+
+# Import time `main` may add on top of FastAPI, as a fraction of FastAPI's own
+# import time measured in the same interpreter. Relative, so it holds on slow
+# or cold machines. About 0.2 here; the LAZY_MODULES check above is the strict one.
+STARTUP_BUDGET_RATIO = float(os.getenv("STARTUP_BUDGET_RATIO", 0.5))
+
+def profile_startup():
+    """
+    Runs `python -X importtime -c "import fastapi; import main"` in a fresh
+    interpreter and returns {module: (self_us, cumulative_us)}. FastAPI is
+    imported first, so `main`'s cumulative time is only what the app adds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import fastapi; import main"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def test_startup_import_budget():
+    timings = profile_startup()
+
+    eager = sorted(name for name in timings if name.split(".")[0] in LAZY_MODULES)
+    assert not eager, f"Heavy modules imported at startup: {eager}"
+
+    fastapi_ms = timings["fastapi"][1] / 1000
+    app_ms = timings["main"][1] / 1000
+    budget_ms = fastapi_ms * STARTUP_BUDGET_RATIO
+    print(f"Startup import time: fastapi {fastapi_ms:.0f}ms + app {app_ms:.0f}ms (app budget {budget_ms:.0f}ms)")
+    assert app_ms <= budget_ms, (
+        f"App import time {app_ms:.0f}ms exceeds {STARTUP_BUDGET_RATIO}x FastAPI's {fastapi_ms:.0f}ms"
+    )
+
+if __name__ == "__main__":
+    test_startup_import_budget()